@@ -1,8 +1,29 @@
 import random
-import math
-from collections import defaultdict
 import os
 
+# 人员类别 (person_role)：决定回溯时适用哪些约束
+ROLE_LEADER = 0  # 组长
+ROLE_EXTERNAL = 1  # 外部专家组员
+ROLE_MEMBER = 2  # 普通组员
+
+
+def luby_sequence():
+    """
+    生成 Luby 重启序列：1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    用作每次随机重启的搜索预算倍数。
+    """
+    i = 1
+    while True:
+        # 第 i 项：若 i = 2^k - 1 则为 2^(k-1)，否则等于第 i - (2^(k-1) - 1) 项
+        j = i
+        while True:
+            k = j.bit_length()
+            if j == (1 << k) - 1:
+                break
+            j -= (1 << (k - 1)) - 1
+        yield 1 << (k - 1)
+        i += 1
+
 # 定义分组生成的主类
 class GroupGeneration:
     """
@@ -15,31 +36,66 @@ class GroupGeneration:
     4. 组长必须是每组的第一个成员。
     """
 
-    # --- 类变量定义 ---
-    M = -1  # 组和组长数 (Number of groups and leaders)
-    N = -1  # 组员数 (Number of general members)
-    external_num = 0  # 外部专家总数 (Total number of external experts)
-
-    group_person_lower_limit = 1
-    group_person_upper_limit = -1  # 每组人数的上限 (Upper limit for people per group)
-    group_external_upper_limit = -1  # 每组外部专家上限 (Upper limit for external experts per group)
-
-    assigned_groups = defaultdict(list)  # 存储分配结果，键为组ID (0到M-1)，值为成员列表
-    group_leaders = []  # 组长列表
-    group_members = []  # 组员列表
-    groups = []  # 组的省份限制列表，groups[i] 存储第 i 组不能包含的省份列表
-
-    group_members_no_external = []  # 非外部专家组员
-    group_members_external = []  # 外部专家组员
+    # --- 类变量定义 (搜索参数，只读) ---
+    nogood_cache_limit = 100000  # 失败状态缓存上限，超过后不再记录，防止内存无限增长
 
-    # 用于限制最多有多少组可以“触顶”（达到上限人数/外部专家数）
-    max_group_external_touch_upper_limit = -1
-    max_group_member_touch_upper_limit = -1
+    # 随机重启：每次尝试的搜索节点预算为 Luby 序列项 * restart_node_unit，
+    # 最多重启 max_restarts 次，最后一次不限预算
+    restart_node_unit = 1000
+    max_restarts = 10
     # --- 结束类变量定义 ---
 
     def __init__(self):
-        # 构造函数，通常用于初始化实例特有的变量，这里保持简洁
-        pass
+        """
+        初始化实例变量。所有可变状态都属于实例，避免多个实例共享同一个列表。
+        """
+        self.M = -1  # 组和组长数 (Number of groups and leaders)
+        self.N = -1  # 组员数 (Number of general members)
+        self.external_num = 0  # 外部专家总数 (Total number of external experts)
+
+        self.group_person_lower_limit = 1
+        self.group_person_upper_limit = -1  # 每组人数的上限 (Upper limit for people per group)
+        self.group_external_upper_limit = -1  # 每组外部专家上限 (Upper limit for external experts per group)
+
+        self.assigned_groups = []  # 存储分配结果，下标为组ID (0到M-1)，值为成员编号列表
+        self.groups = []  # 组的省份限制列表，groups[i] 存储第 i 组不能包含的省份列表
+
+        self.group_members_no_external = []  # 非外部专家组员 (人员编号)
+        self.group_members_external = []  # 外部专家组员 (人员编号)
+
+        # 结构化数组 (SoA)：人员按编号存储，组长编号为 [0, M)，组员编号为 [M, M+N)
+        self._province_id = {}  # 省份名称 -> 省份编号，按首次出现的顺序分配
+        self.province_names = []  # 省份编号 -> 省份名称
+        self.person_name = []  # 人员姓名
+        self.person_prov = []  # 人员省份编号
+        self.person_ext = []  # 人员是否为外部专家
+        self.person_role = []  # 人员类别 ROLE_LEADER / ROLE_EXTERNAL / ROLE_MEMBER
+        self.group_forbidden = []  # group_forbidden[i] 为第 i 组回避省份编号的 frozenset
+        self.person_pmask = []  # 人员省份位掩码 1 << 省份编号
+        self.forbidden_mask = []  # forbidden_mask[i] 为第 i 组回避省份的位掩码，与 person_pmask 按位与为 0 即无冲突
+        self.leader_order = []  # 组长编号的分配顺序
+        self.member_order = []  # 组员编号的分配顺序
+
+        # 用于限制最多有多少组可以“触顶”（达到上限人数/外部专家数）
+        self.max_group_external_touch_upper_limit = -1
+        self.max_group_member_touch_upper_limit = -1
+
+        # 增量计数器：在回溯的放入/撤销时同步维护，避免每次检查都重新扫描所有组
+        self._group_size = []  # _group_size[i] 为第 i 组当前人数
+        self._group_ext = []  # _group_ext[i] 为第 i 组当前外部专家数
+        self._touched_members = 0  # 人数达到 group_person_upper_limit 的组数
+        self._touched_ext = 0  # 外部专家数达到 group_external_upper_limit 的组数
+
+        # _feasible_groups[pid] 为人员 pid 不违反回避条件的组编号列表 (弧相容预处理)
+        self._feasible_groups = []
+        # _symmetric_groups[i] 为编号小于 i、且回避省份与第 i 组完全相同的组 (可互换的组)
+        self._symmetric_groups = []
+
+        # 失败状态缓存 (no-good)：记录已证明无解的 (深度, 各组人数, 各组外部专家数)
+        self._nogoods = set()
+
+        self._node_budget = float('inf')  # 本次尝试的节点预算
+        self._nodes = 0  # 本次尝试已展开的节点数
 
     def parse_input(self, input_text):
         """
@@ -49,11 +105,7 @@ class GroupGeneration:
         lines = [line.strip() for line in lines if line.strip() != '']
 
         # 清空旧数据以支持多次运行
-        self.group_leaders.clear()
-        self.group_members.clear()
-        self.groups.clear()
-        self.assigned_groups.clear()
-        self.external_num = 0
+        self.assigned_groups = []
 
         try:
             self.M = int(lines[0])  # 组长和组的数量
@@ -63,38 +115,16 @@ class GroupGeneration:
 
         lines = lines[2:]
 
-        def get_person_info(text):
-            """内部辅助函数：解析单个人员信息"""
-            parts = text.split()
-            if len(parts) != 2 and len(parts) != 3:
-                raise ValueError(f"人员信息格式错误: {text}")
-            # 检查是否有 "外部" 标识
-            is_external = len(parts) == 3 and parts[2] == "外部"
-            return parts[0], parts[1], is_external
-
-        # 读取组长信息 (M 行)
-        for i in range(self.M):
-            name, province, is_external = get_person_info(lines[i])
-
-            self.group_leaders.append({
-                "name": name,
-                "province": province,
-                "is_external": is_external
-            })
-
-            if is_external: self.external_num += 1
-
-        # 读取组员信息 (N 行)
-        for i in range(self.M, self.M + self.N):
-            name, province, is_external = get_person_info(lines[i])
-
-            self.group_members.append({
-                "name": name,
-                "province": province,
-                "is_external": is_external
-            })
+        # 读取组长信息 (M 行) 和组员信息 (N 行)
+        # 每行 2 或 3 个字段 (第 3 个字段 "外部" 表示外部专家)，无法对全文统一切分，仍需逐行 split
+        person_num = self.M + self.N
+        if person_num > len(lines):
+            raise ValueError("输入文本行数不足，无法解析所有人员信息。")
 
-            if is_external: self.external_num += 1
+        rows = [line.split() for line in lines[:person_num]]
+        for parts in rows:
+            if len(parts) != 2 and len(parts) != 3:
+                raise ValueError(f"人员信息格式错误: {' '.join(parts)}")
 
         # 读取组的省份限制信息 (M 行)
         start_index = self.M + self.N
@@ -110,6 +140,32 @@ class GroupGeneration:
         if len(self.groups) != self.M:
             raise ValueError("解析到的组限制数量与 M 不匹配。")
 
+        # 省份编号：按首次出现的顺序去重后一次性编号
+        self.province_names = list(dict.fromkeys(
+            [parts[1] for parts in rows] + [province for group in self.groups for province in group]
+        ))
+        self._province_id = {province: i for i, province in enumerate(self.province_names)}
+
+        # 构建结构化数组，回溯过程中只使用人员编号和省份编号
+        self.person_name = [parts[0] for parts in rows]
+        self.person_prov = [self._province_id[parts[1]] for parts in rows]
+        self.person_ext = [len(parts) == 3 and parts[2] == "外部" for parts in rows]
+        self.external_num = sum(self.person_ext)
+        self.person_role = [
+            ROLE_LEADER if pid < self.M else ROLE_EXTERNAL if self.person_ext[pid] else ROLE_MEMBER
+            for pid in range(person_num)
+        ]
+        self.group_forbidden = [
+            frozenset(self._province_id[province] for province in group) for group in self.groups
+        ]
+        # Python 整数位数不限，省份数量超过 64 也无需特殊处理
+        self.person_pmask = [1 << prov for prov in self.person_prov]
+        self.forbidden_mask = [
+            sum(1 << prov for prov in forbidden) for forbidden in self.group_forbidden
+        ]
+        self.leader_order = list(range(self.M))
+        self.member_order = list(range(self.M, person_num))
+
 
     def format_output(self):
         """
@@ -124,14 +180,14 @@ class GroupGeneration:
             members = self.assigned_groups[i][1:]
             
             # 格式化组长信息
-            leader_tag = "（外部）" if leader["is_external"] else ""
-            leader_output = f"组长：{leader['name']}{leader_tag}"
+            leader_tag = "（外部）" if self.person_ext[leader] else ""
+            leader_output = f"组长：{self.person_name[leader]}{leader_tag}"
             
             # 格式化组员信息
             members_output_list = []
             for member in members:
-                member_tag = "（外部）" if member['is_external'] else ""
-                members_output_list.append(f"{member['name']}{member_tag}")
+                member_tag = "（外部）" if self.person_ext[member] else ""
+                members_output_list.append(f"{self.person_name[member]}{member_tag}")
             
             members_output = ", ".join(members_output_list)
             
@@ -143,22 +199,25 @@ class GroupGeneration:
 
     def init(self):
         """
-        初始化分组的上下限和触顶限制参数。
+        初始化分组的上下限和触顶限制参数，并预先计算每个人可分配的组。
+        这些结果与随机种子无关，同一输入只需计算一次。
         """
-        total_people = self.M + self.N
+        # 一次 divmod 同时得到平均数和余数，避免 math.ceil 的浮点除法
+        person_quotient, person_remainder = divmod(self.M + self.N, self.M)
+        external_quotient, external_remainder = divmod(self.external_num, self.M)
         
         # 每组人数的下限（平均数向下取整）
-        self.group_person_lower_limit = total_people // self.M
+        self.group_person_lower_limit = person_quotient
         # 每组人数的上限（平均数向上取整）
-        self.group_person_upper_limit = math.ceil(total_people / self.M)
+        self.group_person_upper_limit = person_quotient + (1 if person_remainder else 0)
         
         # 每组外部专家的上限（外部专家平均数向上取整）
-        self.group_external_upper_limit = math.ceil(self.external_num / self.M)
+        self.group_external_upper_limit = external_quotient + (1 if external_remainder else 0)
         
         # 达到人数上限的组数限制 (余数决定)
         # 例如：总人数17，组数5。平均3.4人/组。上限4人/组。
         # 17 % 5 = 2。表示最多只有 2 组可以达到 4 人/组的上限。
-        self.max_group_member_touch_upper_limit = total_people % self.M
+        self.max_group_member_touch_upper_limit = person_remainder
         if self.max_group_member_touch_upper_limit == 0:
              # 如果余数为0，表示所有组平均分配，上限组数为0，但为了允许所有组都达到上限（如果上限=下限），设为M
              # 实际是：如果整除，上限等于下限，所有组都应该等于这个值。这里逻辑需要保证 check() 约束
@@ -172,202 +231,260 @@ class GroupGeneration:
              self.max_group_member_touch_upper_limit = self.M
         
         # 达到外部专家上限的组数限制 (余数决定)
-        self.max_group_external_touch_upper_limit = self.external_num % self.M
+        self.max_group_external_touch_upper_limit = external_remainder
         if self.max_group_external_touch_upper_limit == 0:
              self.max_group_external_touch_upper_limit = self.M
              
-        # 将组员按是否为外部专家分类，便于后续分批次分配
-        self.group_members_external = [mem for mem in self.group_members if mem['is_external'] == True]
-        self.group_members_no_external = [mem for mem in self.group_members if mem['is_external'] == False]
+        # 预先计算每个人可分配的组，回溯时只在这些组中尝试，省份冲突无需再检查
+        self._feasible_groups = [
+            [group_id for group_id in range(self.M) if not pmask & self.forbidden_mask[group_id]]
+            for pmask in self.person_pmask
+        ]
 
-    def assign_backtrace(self, index, people, can_assign_func):
+        # 分配结果和计数器的缓冲区只在这里创建，之后每次尝试由 reset_state() 原地清零复用
+        self.assigned_groups = [[] for _ in range(self.M)]
+        self._group_size = [0] * self.M
+        self._group_ext = [0] * self.M
+
+        # 按回避省份划分等价类：同一类的空组完全可以互换
+        same_class_groups = {}
+        self._symmetric_groups = []
+        for group_id, mask in enumerate(self.forbidden_mask):
+            earlier_groups = same_class_groups.setdefault(mask, [])
+            self._symmetric_groups.append(list(earlier_groups))
+            earlier_groups.append(group_id)
+
+    def init_order(self):
         """
-        通用的回溯法分配函数。
-        
-        :param index: 当前处理的 people 列表中的人员索引。
-        :param people: 待分配的人员列表 (组长、外部专家或普通组员)。
-        :param can_assign_func: 检查人员 person 是否可以分配给组 group_id 的函数。
-        :return: 布尔值，表示是否成功分配所有人员。
+        按 shuffle 打乱后的顺序划分组员并排序，并重置分配结果和增量计数器。
+        每次使用新的种子尝试分配前调用。
         """
-        # 递归终止条件：所有人都已分配
-        if index == len(people):
-            return True
+        # 将组员按是否为外部专家分类，便于后续分批次分配
+        self.group_members_external = [pid for pid in self.member_order if self.person_ext[pid]]
+        self.group_members_no_external = [pid for pid in self.member_order if not self.person_ext[pid]]
 
-        person = people[index]
-        
-        # 尝试分配给每个组
-        for group_id in range(self.M):
-            # 检查是否可以分配
-            if can_assign_func(person, group_id):
-                # 做出选择
-                self.assigned_groups[group_id].append(person)
-                
-                # 递归：尝试分配下一个人
-                if self.assign_backtrace(index + 1, people, can_assign_func):
-                    return True
-                else:
-                    # 撤销选择 (回溯)
-                    self.assigned_groups[group_id].pop()
+        # 最少剩余值 (MRV) 排序：可选组最少的人优先分配，使失败尽早发生
+        # sort 是稳定排序，可选组数相同的人保持 shuffle 打乱后的随机顺序
+        def mrv_key(pid):
+            return len(self._feasible_groups[pid])
 
-        # 所有组都尝试过，但无法分配
-        return False
+        self.leader_order.sort(key=mrv_key)
+        self.group_members_external.sort(key=mrv_key)
+        self.group_members_no_external.sort(key=mrv_key)
+
+        self.reset_state()
 
-    def assign_leaders(self):
+    def reset_state(self):
         """
-        第一阶段：分配组长。组长必须是每组的第一个成员。
-        约束：组长的省份不能在对应组的省份限制列表 groups 中。
+        原地清空分配结果和增量计数器，复用 init() 中创建的缓冲区，避免每次尝试重新分配。
         """
+        for group in self.assigned_groups:
+            group.clear()
+        self._group_size[:] = [0] * self.M
+        self._group_ext[:] = [0] * self.M
+        self._touched_members = 0
+        self._touched_ext = 0
+        # 失败状态缓存只对当前人员顺序有效
+        self._nogoods.clear()
 
-        def can_assign_func(person, group_id):
-            # 省份冲突检查：组长的省份不能出现在该组的限制列表中
-            if person["province"] in self.groups[group_id]:
-                return False
-            # 确保每组只分配一个组长（组长是每组的第一个成员）
-            if len(self.assigned_groups[group_id]) >= 1:
-                return False
-            return True
-        
-        # 随机打乱后的组长列表进行分配
-        if self.assign_backtrace(0, self.group_leaders, can_assign_func):
-            return True
-        else:
-            return False
-
-    def assign_externals(self):
+    def assign_backtrace(self, index, people, can_assign_func):
         """
-        第二阶段：分配外部专家组员。
-        约束：
-        1. 省份冲突。
-        2. 组人数不超过 group_person_upper_limit。
-        3. 组外部专家数不超过 group_external_upper_limit。
-        4. 达到外部专家上限的组数不超过 max_group_external_touch_upper_limit。
+        通用的回溯法分配函数。
+        使用显式栈代替递归，避免 Python 函数调用开销：
+        stack[k] 为 people[index + k] 尚未尝试的候选组迭代器，placed[k] 为其已放入的组。
+        放入/撤销时直接在循环内更新增量计数器，循环内只访问局部变量。
+        给定待分配列表时，剩余人员由深度唯一确定，约束只依赖各组人数和外部专家数，
+        因此 (深度, 各组人数, 各组外部专家数) 完整描述了一个子问题，失败后记入 _nogoods，
+        之后经由其他路径到达相同状态时直接跳过。
+        展开的节点数计入 _nodes，超过 _node_budget 时放弃本次搜索，由 solve() 换种子重启。
+        
+        :param index: 开始处理的 people 列表中的人员索引。
+        :param people: 待分配的人员编号列表 (组长、外部专家组员、普通组员依次排列)。
+        :param can_assign_func: 检查人员编号 pid 是否可以分配给组 group_id 的函数 (省份冲突已预先排除)。
+        :return: 布尔值，表示是否成功分配所有人员。
         """
+        people_num = len(people)
+        # 终止条件：所有人都已分配
+        if index == people_num:
+            return True
 
-        def get_group_touch_limit(group_id):
-            """计算当前已分配的组中，外部专家数达到上限的组的数量。"""
-            used_group_touched_num = 0
-            # 检查当前组是否已经触顶
-            is_this_group_touched = False 
-            
-            for group_id_ in range(self.M):
-                group = self.assigned_groups[group_id_]
+        # 有人没有任何满足回避条件的组，直接失败
+        feasible_groups = self._feasible_groups
+        if any(not feasible_groups[pid] for pid in people[index:]):
+            return False
 
-                external_num = sum(1 for person in group if person["is_external"])
+        # 将热点属性绑定为局部变量
+        assigned_groups = self.assigned_groups
+        group_size = self._group_size
+        group_ext = self._group_ext
+        person_ext = self.person_ext
+        person_upper = self.group_person_upper_limit
+        external_upper = self.group_external_upper_limit
+
+        # 缓存与待分配列表的顺序绑定，由 reset_state() 在每次尝试前清空
+        nogoods = self._nogoods
+        nogood_cache_limit = self.nogood_cache_limit
+        nodes = self._nodes
+        node_budget = self._node_budget
+
+        def candidates(depth):
+            # 已知失败的状态，不再展开
+            if state_keys[-1] in nogoods:
+                return iter(())
+            # 最少约束值 (LCV) 排序：优先尝试人数最少 (剩余容量最多) 的组，提高第一个分支就成功的概率
+            # sort 是稳定排序，人数相同的组保持 shuffle 打乱后的随机顺序，保证分组结果随种子变化
+            pid = people[index + depth]
+            return iter(sorted(feasible_groups[pid], key=group_size.__getitem__))
+
+        state_keys = [(0, tuple(group_size), tuple(group_ext))]
+        stack = [candidates(0)]
+        placed = []
+
+        while stack:
+            pid = people[index + len(placed)]
+
+            # 继续尝试当前人员剩余的候选组
+            for group_id in stack[-1]:
+                if can_assign_func(pid, group_id):
+                    # 做出选择，并更新增量计数器
+                    assigned_groups[group_id].append(pid)
+                    placed.append(group_id)
+
+                    group_size[group_id] += 1
+                    if group_size[group_id] == person_upper:
+                        self._touched_members += 1
+
+                    if person_ext[pid]:
+                        group_ext[group_id] += 1
+                        if group_ext[group_id] == external_upper:
+                            self._touched_ext += 1
+                    break
+            else:
+                # 所有组都尝试过，但无法分配：记录失败状态，撤销上一个人的选择 (回溯)
+                stack.pop()
+                if len(nogoods) < nogood_cache_limit:
+                    nogoods.add(state_keys.pop())
+                else:
+                    state_keys.pop()
+                if not placed:
+                    continue
+
+                group_id = placed.pop()
+                pid = assigned_groups[group_id].pop()
+
+                if group_size[group_id] == person_upper:
+                    self._touched_members -= 1
+                group_size[group_id] -= 1
+
+                if person_ext[pid]:
+                    if group_ext[group_id] == external_upper:
+                        self._touched_ext -= 1
+                    group_ext[group_id] -= 1
+                continue
+
+            # 所有人都已分配
+            if index + len(placed) == people_num:
+                self._nodes = nodes
+                return True
+
+            # 超出本次尝试的搜索预算，放弃
+            nodes += 1
+            if nodes > node_budget:
+                self._nodes = nodes
+                return False
 
-                # 检查当前组是否达到外部专家上限（用于判断回溯前后的状态）
-                if group_id_ == group_id and external_num >= self.group_external_upper_limit:
-                    is_this_group_touched = True
-                    
-                # 计算已触顶组的数量
-                if external_num >= self.group_external_upper_limit:
-                    used_group_touched_num += 1
+            # 处理下一个人
+            state_keys.append((len(placed), tuple(group_size), tuple(group_ext)))
+            stack.append(candidates(len(placed)))
 
-            return is_this_group_touched, used_group_touched_num
+        # 所有分支都已穷尽
+        self._nodes = nodes
+        return False
 
-        def get_group_external_num(group_id):
-            """计算指定组当前的外部专家数量。"""
-            return sum(1 for person in self.assigned_groups[group_id] if person["is_external"])
+    def assign_all(self):
+        """
+        在同一次回溯中依次分配组长、外部专家组员和普通组员。
+        三类人员合并为一个列表，后面的人无法分配时可以回退到前面任意一类人的选择。
+        省份冲突已由 _feasible_groups 排除，其余约束按人员类别区分：
+        组长：每组只有一个组长，且组长是每组的第一个成员。
+        (对称性破除：回避省份相同的空组可以互换，组长只放入同类中编号最小的空组)
+        外部专家组员 (先于普通组员分配，优先满足外部专家数的限制)：
+        1. 组人数不超过 group_person_upper_limit。
+        2. 组外部专家数不超过 group_external_upper_limit。
+        3. 达到外部专家上限的组数不超过 max_group_external_touch_upper_limit。
+        普通组员：
+        1. 组人数不超过 group_person_upper_limit。
+        2. 达到人数上限的组数不超过 max_group_member_touch_upper_limit。
+        """
+        # 将热点属性绑定为局部变量 (触顶组数在回溯中会变化，仍需从 self 读取)
+        group_size = self._group_size
+        group_ext = self._group_ext
+        person_role = self.person_role
+        symmetric_groups = self._symmetric_groups
+        person_upper = self.group_person_upper_limit
+        external_upper = self.group_external_upper_limit
+        max_touched_ext = self.max_group_external_touch_upper_limit
+        max_touched_members = self.max_group_member_touch_upper_limit
+
+        def can_assign_func(pid, group_id):
+            current_member_num = group_size[group_id]
+            role = person_role[pid]
+
+            if role == ROLE_LEADER:
+                # 确保每组只分配一个组长（组长是每组的第一个成员）
+                if current_member_num != 0:
+                    return False
+                # 同类中还有编号更小的空组时跳过，避免重复搜索等价的分支
+                for earlier_group_id in symmetric_groups[group_id]:
+                    if group_size[earlier_group_id] == 0:
+                        return False
+                return True
 
-        def can_assign_func(person, group_id):
-            # 省份冲突检查
-            if person["province"] in self.groups[group_id]:
+            # 总人数上限检查
+            if current_member_num >= person_upper:
                 return False
 
-            this_group_external_num = get_group_external_num(group_id)
-            
-            # 外部专家数上限检查
-            if this_group_external_num >= self.group_external_upper_limit:
-                return False
+            if role == ROLE_EXTERNAL:
+                this_group_external_num = group_ext[group_id]
 
-            # 总人数上限检查
-            if len(self.assigned_groups[group_id]) >= self.group_person_upper_limit:
-                return False
-            
-            # 外部专家触顶组数限制检查
-            _, used_group_touched_num = get_group_touch_limit(group_id)
-            
-            # 假设分配当前外部专家后，该组将触顶
-            if this_group_external_num + 1 >= self.group_external_upper_limit:
-                # 如果当前已触顶的组数已达到最大限制
-                if used_group_touched_num >= self.max_group_external_touch_upper_limit:
+                # 外部专家数上限检查
+                if this_group_external_num >= external_upper:
                     return False
-            
-            return True
-
 
-        # 随机打乱后的外部专家组员列表进行分配
-        if self.assign_backtrace(0, self.group_members_external, can_assign_func):
-            return True
-        else:
-            return False
+                # 外部专家触顶组数限制检查
+                # 假设分配当前外部专家后，该组将触顶，且当前已触顶的组数已达到最大限制
+                if this_group_external_num + 1 >= external_upper and self._touched_ext >= max_touched_ext:
+                    return False
+                return True
 
-    def assign_members(self):
-        """
-        第三阶段：分配普通组员（非外部专家）。
-        约束：
-        1. 省份冲突。
-        2. 组人数不超过 group_person_upper_limit。
-        3. 达到人数上限的组数不超过 max_group_member_touch_upper_limit。
-        """
-        
-        def get_group_touch_limit(group_id):
-            """计算当前已分配的组中，人数达到上限的组的数量。"""
-            used_group_touched_num = 0
-            is_this_group_touched = False
-            
-            for group_id_ in range(self.M):
-                group = self.assigned_groups[group_id_]
-
-                member_num = len(group)
-                
-                # 检查当前组是否已经触顶
-                if group_id_ == group_id and member_num >= self.group_person_upper_limit:
-                    is_this_group_touched = True
-                
-                # 计算已触顶组的数量
-                if member_num >= self.group_person_upper_limit:
-                    used_group_touched_num += 1
-
-            return is_this_group_touched, used_group_touched_num
-
-        def can_assign_func(person, group_id):
-            # 省份冲突检查
-            if person["province"] in self.groups[group_id]:
-                return False
-            
-            current_member_num = len(self.assigned_groups[group_id])
-            
-            # 总人数上限检查
-            if current_member_num >= self.group_person_upper_limit:
-                return False
-            
             # 人数触顶组数限制检查
-            _, used_group_touched_num = get_group_touch_limit(group_id)
-            
-            # 假设分配当前组员后，该组将触顶
-            if current_member_num + 1 >= self.group_person_upper_limit:
-                # 如果当前已触顶的组数已达到最大限制
-                if used_group_touched_num >= self.max_group_member_touch_upper_limit:
-                    return False
-            
-            return True
-        
-        
-        # 随机打乱后的普通组员列表进行分配
-        if self.assign_backtrace(0, self.group_members_no_external, can_assign_func):
+            # 假设分配当前组员后，该组将触顶，且当前已触顶的组数已达到最大限制
+            if current_member_num + 1 >= person_upper and self._touched_members >= max_touched_members:
+                return False
             return True
-        else:
-            return False
+
+        # 组长、外部专家组员、普通组员依次分配，各类内部为 MRV 排序后的顺序
+        people = self.leader_order + self.group_members_external + self.group_members_no_external
+        return self.assign_backtrace(0, people, can_assign_func)
 
     def shuffle(self, seed):
         """
-        使用给定的种子随机打乱组长和组员列表，以尝试不同的分配顺序。
+        使用给定的种子随机打乱组长和组员的分配顺序，以尝试不同的分配顺序。
+        同时打乱每个人的可选组列表，使回溯中人数相同的组按随机顺序尝试。
+        只打乱编号列表，且使用独立的随机数生成器，不影响全局 random 状态。
         """
-        random.seed(seed)
-        random.shuffle(self.group_leaders)
-        random.shuffle(self.group_members)
+        rng = random.Random(seed)
+
+        self.leader_order = list(range(self.M))
+        rng.shuffle(self.leader_order)
 
-    def check(self):
+        self.member_order = list(range(self.M, self.M + self.N))
+        rng.shuffle(self.member_order)
+
+        for feasible in self._feasible_groups:
+            rng.shuffle(feasible)
+
+    def check(self, check_provinces=__debug__):
         """
         检查最终分组结果是否满足所有约束条件。
         约束包括：
@@ -376,56 +493,66 @@ class GroupGeneration:
         3. 最高组人数和最低组人数之差是否不超过 1。
         4. 省份冲突检查 (组员省份不能在组限制中)。
         5. 每组至少包含 1 个外部专家 (此处为 1 的硬性要求)。
+        1、2、3、5 直接对增量计数器 _group_size / _group_ext 做几次 O(M) 的汇总判断。
+        回溯只会在 _feasible_groups 中选组，不会产生省份冲突，因此逐人检查省份 (约束 4)
+        和核对计数器只在 check_provinces 为真时进行，默认在调试模式 (未使用 python -O) 下开启。
+
+        :param check_provinces: 是否逐人扫描分组结果，检查省份冲突并核对计数器。
         """
-        total_people = 0
-        lowest_group_person_num = float('inf')
-        highest_group_person_num = float('-inf')
-        
-        # 遍历所有组
-        for group_id in range(self.M):
-            group = self.assigned_groups[group_id]
-            group_len = len(group)
-            
-            # 检查每组人数是否在上下限范围内
-            if group_len > self.group_person_upper_limit:
-                print(f"Check Error: Group {group_id + 1} person num {group_len} > upper limit {self.group_person_upper_limit}")
-                return False
-            if group_len < self.group_person_lower_limit:
-                print(f"Check Error: Group {group_id + 1} person num {group_len} < lower limit {self.group_person_lower_limit}")
-                return False
-                
-            external_num = 0
-            for person in group:
-                total_people += 1
-                if person["is_external"]:
-                    external_num += 1
-                
-                # 检查省份冲突
-                if person["province"] in self.groups[group_id]:
-                    print(f"Check Error: Person {person['name']} province {person['province']} in group {group_id + 1} conflict {self.groups[group_id]}")
-                    return False
-            
-            # 检查每组至少有 1 个外部专家 (根据原代码逻辑，此处是 >= 1)
-            # ⚠️ 注意: 尽管原代码 group_external_lower_limit 被初始化为 1，但它并未在 init 或 check 中被正确使用。
-            # 原来的 check 函数中检查的是 if external_num < 1: return False
-            if external_num < 1:
-                print(f"Check Error: Group {group_id + 1} external num {external_num} < 1")
-                return False
-            
-            # 更新最高和最低人数
-            highest_group_person_num = max(highest_group_person_num, group_len)
-            lowest_group_person_num = min(lowest_group_person_num, group_len)
-        
+        group_size = self._group_size
+        group_ext = self._group_ext
+
         # 检查总人数是否与 M+N 相等
+        total_people = sum(group_size)
         if total_people != self.M + self.N:
             print(f"Check Error: Total people {total_people} != M+N {self.M + self.N}")
             return False
-        
+
+        # 检查每组人数是否在上下限范围内
+        highest_group_person_num = max(group_size)
+        lowest_group_person_num = min(group_size)
+        if highest_group_person_num > self.group_person_upper_limit:
+            group_id = group_size.index(highest_group_person_num)
+            print(f"Check Error: Group {group_id + 1} person num {highest_group_person_num} > upper limit {self.group_person_upper_limit}")
+            return False
+        if lowest_group_person_num < self.group_person_lower_limit:
+            group_id = group_size.index(lowest_group_person_num)
+            print(f"Check Error: Group {group_id + 1} person num {lowest_group_person_num} < lower limit {self.group_person_lower_limit}")
+            return False
+
         # 检查最高人数和最低人数之差是否不超过 1 (确保人数分配尽量均衡)
         if highest_group_person_num - lowest_group_person_num > 1:
             print(f"Check Error: Person num difference {highest_group_person_num - lowest_group_person_num} > 1")
             return False
 
+        # 检查每组至少有 1 个外部专家 (根据原代码逻辑，此处是 >= 1)
+        # ⚠️ 注意: 尽管原代码 group_external_lower_limit 被初始化为 1，但它并未在 init 或 check 中被正确使用。
+        # 原来的 check 函数中检查的是 if external_num < 1: return False
+        lowest_external_num = min(group_ext)
+        if lowest_external_num < 1:
+            group_id = group_ext.index(lowest_external_num)
+            print(f"Check Error: Group {group_id + 1} external num {lowest_external_num} < 1")
+            return False
+
+        if not check_provinces:
+            return True
+
+        # 逐人扫描：核对增量计数器，并检查省份冲突
+        for group_id in range(self.M):
+            group = self.assigned_groups[group_id]
+
+            scanned_external_num = sum(1 for pid in group if self.person_ext[pid])
+            if len(group) != group_size[group_id] or scanned_external_num != group_ext[group_id]:
+                print(f"Check Error: Group {group_id + 1} counters ({group_size[group_id]}, {group_ext[group_id]}) != scanned ({len(group)}, {scanned_external_num})")
+                return False
+
+            for pid in group:
+                # 检查省份冲突
+                if self.person_pmask[pid] & self.forbidden_mask[group_id]:
+                    province = self.province_names[self.person_prov[pid]]
+                    print(f"Check Error: Person {self.person_name[pid]} province {province} in group {group_id + 1} conflict {self.groups[group_id]}")
+                    return False
+
         return True
 
     def random_way(self, seed):
@@ -437,47 +564,61 @@ class GroupGeneration:
         print("Warning: Calling deprecated random_way method.")
         while True:
             self.shuffle(seed)
-            self.assigned_groups = defaultdict(list)
+            self.reset_state()
             
             # 简单分配：组长按顺序分配
             for i in range(self.M):
-                self.assigned_groups[i].append(self.group_leaders[i])
+                self.assigned_groups[i].append(self.leader_order[i])
 
             # 简单分配：组员轮流分配
             for i in range(self.N):
-                self.assigned_groups[i % self.M].append(self.group_members[i])
+                self.assigned_groups[i % self.M].append(self.member_order[i])
+
+            # 此方法不经过回溯，需要重新统计 check() 使用的计数器
+            for i in range(self.M):
+                self._group_size[i] = len(self.assigned_groups[i])
+                self._group_ext[i] = sum(1 for pid in self.assigned_groups[i] if self.person_ext[pid])
 
-            # 检查分配结果是否符合要求
-            if self.check():
+            # 检查分配结果是否符合要求 (此方法不经过 _feasible_groups，必须逐人检查省份冲突)
+            if self.check(check_provinces=True):
                 return
             
-            # 如果不符合要求，将通过外部循环继续尝试不同的 seed
+            # 如果不符合要求，下一轮循环使用新的 seed 重新打乱
             seed += 1
-            random.seed(seed)
-            self.shuffle(seed)
 
 
-    def run(self, seed, text):
+    def prepare(self, text):
         """
-        主执行函数：解析输入、初始化参数、分阶段分配。
+        解析输入并完成与种子无关的初始化，之后可用不同种子多次调用 solve()。
         """
-        
         self.parse_input(text)
-        self.shuffle(seed)  # 使用种子打乱顺序，以尝试不同的解
         self.init()
 
-        # 1. 分配组长 (Leaders)
-        if self.assign_leaders() == False:
-            return "无法找到匹配的分配方式 (分配组长失败)"
-        
-        # 2. 分配外部专家组员 (External Members)
-        # 这一步是为了优先满足外部专家数的限制
-        if self.assign_externals() == False:
-            return "无法找到匹配的分配方式 (分配外部专家失败)"
-            
-        # 3. 分配普通组员 (General Members)
-        if self.assign_members() == False:
-            return "无法找到匹配的分配方式 (分配普通组员失败)"
+    def solve(self, seed):
+        """
+        使用给定种子分配所有人员，需先调用 prepare()。
+        某次尝试超出搜索预算时，换用新的种子随机重启 (预算按 Luby 序列增长)；
+        在预算内穷尽所有分支说明输入无解，直接返回失败。
+        """
+        for attempt, luby in enumerate(luby_sequence()):
+            # 最后一次尝试不限预算，保证不会因预算而漏解
+            if attempt >= self.max_restarts:
+                self._node_budget = float('inf')
+            else:
+                self._node_budget = luby * self.restart_node_unit
+            self._nodes = 0
+
+            self.shuffle(seed + attempt)  # 使用种子打乱顺序，以尝试不同的解
+            self.init_order()
+
+            # 依次分配组长、外部专家组员和普通组员
+            if self.assign_all():
+                break
+
+            # 未超出预算却失败：合并后的回溯已尝试所有分支，证明无解，无需重启
+            # (最后一次尝试不限预算，失败时也从这里返回)
+            if self._nodes <= self._node_budget:
+                return "无法找到匹配的分配方式"
 
         # self.random_way(seed) # 废弃方法
 
@@ -487,6 +628,13 @@ class GroupGeneration:
              return "成功找到分配方式，但最终校验失败，可能存在逻辑错误。"
 
         return self.format_output()
+
+    def run(self, seed, text):
+        """
+        主执行函数：解析输入、初始化参数、分配人员。
+        """
+        self.prepare(text)
+        return self.solve(seed)
         
 def test_group_generation(file_path, iterations=300):
     """
@@ -503,11 +651,14 @@ def test_group_generation(file_path, iterations=300):
         return
 
     print(f"--- 开始运行 {iterations} 次随机种子测试 ---")
+
+    # 输入只解析一次，每个种子只重新打乱和搜索
+    groupGeneration.prepare(text)
     
     all_passed = True
     for i in range(iterations):
         # 运行分配
-        result = groupGeneration.run(i, text)
+        result = groupGeneration.solve(i)
         
         # 检查分配是否成功
         if "无法找到匹配的分配方式" in result or "校验失败" in result: